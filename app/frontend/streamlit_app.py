@@ -86,12 +86,12 @@ def get_stock_data(index_symbol, limit=50):
     except:
         return []
 
-def send_chat_message(message):
+def send_chat_message(message, session_id=None):
     """Send chat message to API"""
     try:
         response = requests.post(
             f"{API_BASE_URL}/chat",
-            json={"message": message},
+            json={"message": message, "session_id": session_id},
             timeout=30
         )
         if response.status_code == 200:
@@ -200,7 +200,9 @@ def show_chat_page():
         # Get bot response
         with st.chat_message("assistant"):
             with st.spinner("🤔 Thinking..."):
-                response = send_chat_message(prompt)
+                response = send_chat_message(prompt, st.session_state.get("session_id"))
+                if response and response.get("session_id"):
+                    st.session_state.session_id = response["session_id"]
                 
                 if response and response.get("success", False):
                     bot_response = response["response"]
@@ -230,6 +232,12 @@ def show_chat_page():
     # Clear chat button
     if st.button("🗑️ Clear Chat History"):
         st.session_state.messages = []
+        session_id = st.session_state.pop("session_id", None)
+        if session_id:
+            try:
+                requests.delete(f"{API_BASE_URL}/sessions/{session_id}", timeout=5)
+            except:
+                pass
         st.rerun()
 
 def show_data_analysis_page():
@@ -1,8 +1,15 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import uvicorn
 from typing import List, Dict, Any
+from dotenv import load_dotenv
+
+# Load .env before the local modules, some settings are read at import time
+# (SEMANTIC_CACHE_THRESHOLD) or before the LLM client exists (APP_WARMUP)
+load_dotenv()
 
 # Import local modules
 from app.utlits.schemas import ChatRequest, ChatResponse, IndexInfo, StockData, DataSummary
@@ -12,14 +19,35 @@ from app.utlits.functions import (
     process_chat_message,
     get_stock_data_by_index,
     get_index_info_by_region,
-    query_gemini
+    query_gemini,
+    warm_up
 )
+from app.utlits.memory import conversation_store
+from app.utlits.semantic_cache import semantic_cache
+from app.utlits.llm import LLMError, LLMTimeoutError, get_llm_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up data, heavy libraries and the LLM client at startup.
+    APP_WARMUP: "background" (default, serve immediately), "blocking" or "off"
+    """
+    mode = os.getenv("APP_WARMUP", "background").lower()
+    task = None
+    if mode == "blocking":
+        await asyncio.to_thread(warm_up)
+    elif mode == "background":
+        task = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    if task is not None and not task.done():
+        task.cancel()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Stock Market Chatbot API",
     description="A chatbot API for stock market data analysis using Gemini AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -43,6 +71,9 @@ async def root():
             "indices": "/indices",
             "stock_data": "/stock-data/{index_symbol}",
             "region_indices": "/indices/region/{region}",
+            "sessions": "/sessions/{session_id}",
+            "cache_stats": "/cache/stats",
+            "llm_stats": "/llm/stats",
             "health": "/health"
         }
     }
@@ -61,18 +92,57 @@ async def chat_endpoint(request: ChatRequest):
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        # Process the chat message
-        result = process_chat_message(request.message)
+        # Process the chat message on a worker thread; the LLM call blocks
+        result = await asyncio.to_thread(process_chat_message, request.message, request.session_id)
         
         return ChatResponse(
             response=result["response"],
             data=result.get("data"),
             success=result["success"],
-            error=result.get("error")
+            error=result.get("error"),
+            session_id=result.get("session_id")
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """
+    Forget the conversation history for a chat session
+    """
+    if not conversation_store.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+    return {"success": True, "session_id": session_id}
+
+@app.get("/sessions/stats")
+async def get_session_stats():
+    """
+    Get conversation store statistics
+    """
+    return conversation_store.stats()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get semantic cache hit-rate and savings statistics
+    """
+    return semantic_cache.stats()
+
+@app.delete("/cache")
+async def clear_cache():
+    """
+    Clear the semantic cache
+    """
+    semantic_cache.clear()
+    return {"success": True}
+
+@app.get("/llm/stats")
+async def get_llm_stats():
+    """
+    Get circuit breaker state for each LLM backend
+    """
+    return get_llm_client().stats()
+
 @app.get("/data/summary", response_model=DataSummary)
 async def get_data_summary_endpoint():
     """
@@ -171,12 +241,18 @@ async def direct_gemini_query(request: ChatRequest):
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        response = query_gemini(request.message, request.context or "")
+        response = await asyncio.to_thread(query_gemini, request.message, request.context or "")
         
         return {
             "response": response,
             "success": True
         }
+    except HTTPException:
+        raise
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"Gemini timed out: {str(e)}")
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=f"Error querying Gemini: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error querying Gemini: {str(e)}")
 
@@ -196,6 +272,8 @@ async def internal_error_handler(request, exc):
     )
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -1,20 +1,19 @@
-import os
-import pandas as pd
-import google.generativeai as genai
 from typing import Dict, List, Optional, Any
-from dotenv import load_dotenv
 import json
+import time
+from app.utlits.memory import conversation_store
+from app.utlits.router import route_message, load_router_data
+from app.utlits.semantic_cache import semantic_cache, embed, is_standalone
+from app.utlits.llm import get_llm_client
 
-# Load environment variables
-load_dotenv()
-
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
+# pandas is imported inside the data functions so importing the API stays fast;
+# it is loaded once on first use (or during warm-up, see warm_up below)
 
 # Load data
 def load_csv_data():
     """Load all CSV files and return as dictionaries"""
+    import pandas as pd
+    
     try:
         # Load index information
         index_info_df = pd.read_csv("app/data/indexInfo.csv")
@@ -36,6 +35,8 @@ def load_csv_data():
 
 def get_data_summary():
     """Get summary statistics of the data"""
+    import pandas as pd
+    
     try:
         index_info_df = pd.read_csv("app/data/indexInfo.csv")
         index_data_df = pd.read_csv("app/data/indexData.csv")
@@ -54,33 +55,31 @@ def get_data_summary():
         print(f"Error getting data summary: {e}")
         return None
 
-def query_gemini(prompt: str, context: str = "") -> str:
-    """Query Gemini API with the given prompt and context"""
-    try:
-        # Create the full prompt with context
-        full_prompt = f"""
-        Context about stock market data:
-        {context}
-        
-        User Question: {prompt}
-        
-        Please provide a helpful response based on the available stock market data. 
-        If the question is about specific data that's not available in the context, 
-        please mention that and provide general information about stock markets.
-        """
-        
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Generate response
-        response = model.generate_content(full_prompt)
-        
-        return response.text
-    except Exception as e:
-        return f"Error generating response: {str(e)}"
+def query_gemini(prompt: str, context: str = "", history: str = "") -> str:
+    """
+    Query the configured LLM backend with the given prompt, context and conversation history.
+    Raises LLMError (or LLMTimeoutError) if no backend could answer.
+    """
+    # Create the full prompt with context
+    full_prompt = f"""
+    Context about stock market data:
+    {context}
+    
+    {history}
+    
+    User Question: {prompt}
+    
+    Please provide a helpful response based on the available stock market data. 
+    If the question is about specific data that's not available in the context, 
+    please mention that and provide general information about stock markets.
+    """
+    
+    return get_llm_client().generate(full_prompt)
 
 def get_stock_data_by_index(index_symbol: str, limit: int = 10) -> List[Dict]:
     """Get stock data for a specific index"""
+    import pandas as pd
+    
     try:
         df = pd.read_csv("app/data/indexData.csv")
         filtered_df = df[df['Index'] == index_symbol].head(limit)
@@ -91,6 +90,8 @@ def get_stock_data_by_index(index_symbol: str, limit: int = 10) -> List[Dict]:
 
 def get_index_info_by_region(region: str) -> List[Dict]:
     """Get index information for a specific region"""
+    import pandas as pd
+    
     try:
         df = pd.read_csv("app/data/indexInfo.csv")
         filtered_df = df[df['Region'].str.contains(region, case=False, na=False)]
@@ -101,6 +102,8 @@ def get_index_info_by_region(region: str) -> List[Dict]:
 
 def create_context_for_chat() -> str:
     """Create context string for the chatbot"""
+    import pandas as pd
+    
     try:
         index_info_df = pd.read_csv("app/data/indexInfo.csv")
         
@@ -116,14 +119,42 @@ def create_context_for_chat() -> str:
         print(f"Error creating context: {e}")
         return "Stock market data is available for various global indices."
 
-def process_chat_message(message: str) -> Dict[str, Any]:
+def process_chat_message(message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
     """Process chat message and return response with relevant data"""
+    session = conversation_store.get_or_create(session_id)
     try:
+        # Answer simple data questions directly without calling the LLM
+        routed = route_message(message)
+        if routed is not None:
+            session.add_exchange(message, routed["response"])
+            return {
+                "response": routed["response"],
+                "data": routed["data"],
+                "success": True,
+                "session_id": session.session_id
+            }
+        
+        # Reuse answers to similar questions, except for follow-ups that depend on history
+        history = session.render_history()
+        cacheable = not history or is_standalone(message)
+        cached = semantic_cache.lookup(message) if cacheable else None
+        if cached is not None:
+            session.add_exchange(message, cached["response"])
+            return {
+                "response": cached["response"],
+                "data": cached["data"],
+                "success": True,
+                "session_id": session.session_id
+            }
+        
         # Create context
         context = create_context_for_chat()
         
-        # Get response from Gemini
-        response = query_gemini(message, context)
+        # Get response from Gemini with the compact history for this session
+        started = time.perf_counter()
+        response = query_gemini(message, context, history)
+        llm_seconds = time.perf_counter() - started
+        session.add_exchange(message, response)
         
         # Extract any specific data requests
         data = None
@@ -148,15 +179,31 @@ def process_chat_message(message: str) -> Dict[str, Any]:
                     data = {"index_info": index_info}
                 break
         
+        if cacheable:
+            semantic_cache.store(message, response, data, llm_seconds, len(context) + len(message))
+        
         return {
             "response": response,
             "data": data,
-            "success": True
+            "success": True,
+            "session_id": session.session_id
         }
     except Exception as e:
         return {
             "response": f"Sorry, I encountered an error: {str(e)}",
             "data": None,
             "success": False,
-            "error": str(e)
+            "error": str(e),
+            "session_id": session.session_id
         }
+
+def warm_up():
+    """Load data, heavy libraries and the LLM client so the first request is fast"""
+    started = time.perf_counter()
+    try:
+        load_router_data()
+        embed("warm up")
+        get_llm_client().warm_up()
+        print(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        print(f"Error during warm-up: {e}")
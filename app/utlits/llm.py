@@ -0,0 +1,297 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from typing import List, Optional
+
+# LLM client settings (overridable through environment variables)
+DEFAULT_MODELS = "gemini-2.0-flash,gemini-2.0-flash-lite"
+DEFAULT_TIMEOUT_SECONDS = 12.0       # per model call
+DEFAULT_TOTAL_TIMEOUT_SECONDS = 25.0 # whole chain, below the Streamlit client's 30s
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_HEDGE_AFTER_SECONDS = 0.0   # 0 disables hedged requests
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+# HTTP statuses worth retrying: rate limit and server errors
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503}
+# HTTP statuses reported as timeouts: request timeout and gateway / deadline exceeded
+TIMEOUT_STATUS_CODES = {408, 504}
+
+# Calls run on worker threads so they can be timed out and hedged. A timed-out
+# call cannot be cancelled; its thread finishes in the background and is ignored.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm")
+
+
+class LLMError(Exception):
+    """Raised when no backend could produce a response"""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when a backend did not respond within the timeout"""
+
+
+def _is_timeout(error: Exception) -> bool:
+    """True for errors meaning the backend ran out of time (e.g. Gemini DeadlineExceeded)"""
+    if isinstance(error, TimeoutError):
+        return True
+    # google.api_core exceptions carry the HTTP status as `code`
+    return getattr(error, "code", None) in TIMEOUT_STATUS_CODES
+
+
+def _is_transient(error: Exception) -> bool:
+    """True for errors a retry can fix (connection drops, 429 and 5xx)"""
+    if isinstance(error, ConnectionError):
+        return True
+    return getattr(error, "code", None) in TRANSIENT_STATUS_CODES
+
+
+class LLMProvider:
+    """Base class for LLM backends"""
+
+    name = "base"
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Load SDKs / build clients ahead of the first request"""
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini backend for a single model"""
+
+    _configure_lock = threading.Lock()
+    _configured = False
+
+    def __init__(self, model_name: str, api_key: Optional[str] = None):
+        self.model_name = model_name
+        self.name = f"gemini:{model_name}"
+        self.api_key = api_key
+        self._model = None
+
+    def _get_model(self):
+        """Import the SDK and build the model on first use"""
+        if self._model is None:
+            import google.generativeai as genai
+            with GeminiProvider._configure_lock:
+                if not GeminiProvider._configured:
+                    genai.configure(api_key=self.api_key)
+                    GeminiProvider._configured = True
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def warm_up(self):
+        if self.api_key:
+            self._get_model()
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        if not self.api_key:
+            raise LLMError("GEMINI_API_KEY is not set")
+        response = self._get_model().generate_content(
+            prompt, request_options={"timeout": timeout}
+        )
+        return response.text
+
+
+class LocalProvider(LLMProvider):
+    """Offline stand-in that answers without any network access (for development and tests)"""
+
+    name = "local"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        question = prompt.rsplit("User Question:", 1)[-1].strip().splitlines()[0] if prompt else ""
+        return (
+            f"[local model] I received your question: \"{question}\". "
+            "The Gemini backend is not configured, so this is a placeholder answer."
+        )
+
+
+class CircuitBreaker:
+    """Stops calling a backend after repeated failures, then lets one trial call through"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                # Half-open: allow a trial call, re-open immediately if it fails
+                self.opened_at = None
+                self.failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        return "open" if self.opened_at is not None else "closed"
+
+
+class LLMClient:
+    """
+    Calls a chain of providers in order (e.g. flash, then a smaller model).
+
+    Each provider gets retries with jittered exponential backoff for transient
+    errors, an optional hedged duplicate request when the first one is slow, and
+    a circuit breaker. A timeout or a non-transient error moves straight to the
+    next provider. Retries and fallbacks all share one total time budget.
+    """
+
+    def __init__(self, providers: List[LLMProvider], timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 hedge_after: float = DEFAULT_HEDGE_AFTER_SECONDS,
+                 total_timeout: float = DEFAULT_TOTAL_TIMEOUT_SECONDS):
+        if not providers:
+            raise ValueError("At least one LLM provider is required")
+        self.providers = providers
+        self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.hedge_after = hedge_after
+        self.breakers = {provider.name: CircuitBreaker() for provider in providers}
+
+    def _call(self, provider: LLMProvider, prompt: str, timeout: float) -> str:
+        """Run one (possibly hedged) call, raising LLMTimeoutError if nothing finishes in time"""
+        deadline = time.monotonic() + timeout
+        futures = [_executor.submit(provider.generate, prompt, timeout)]
+        hedged = not self.hedge_after or self.hedge_after >= timeout
+
+        while futures:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining if hedged else min(remaining, self.hedge_after)
+            done, _ = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+            if not futures:
+                # Every in-flight request failed; let the retry loop back off
+                raise error
+            if not hedged:
+                # First request is slow: fire a duplicate and take whichever finishes first
+                hedged = True
+                futures.append(_executor.submit(provider.generate, prompt, timeout))
+
+        raise LLMTimeoutError(f"{provider.name} timed out after {timeout:.1f}s")
+
+    def generate(self, prompt: str) -> str:
+        """Return the first successful response from the provider chain"""
+        deadline = time.monotonic() + self.total_timeout
+        errors: List[LLMError] = []
+        for provider in self.providers:
+            breaker = self.breakers[provider.name]
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    errors.append(LLMTimeoutError(
+                        f"{provider.name}: request budget of {self.total_timeout:g}s used up"
+                    ))
+                    break
+                if not breaker.allow():
+                    errors.append(LLMError(f"{provider.name}: circuit open"))
+                    break
+                try:
+                    text = self._call(provider, prompt, min(self.timeout, remaining))
+                    breaker.record_success()
+                    return text
+                except LLMTimeoutError as e:
+                    breaker.record_failure()
+                    errors.append(e)
+                    break
+                except LLMError as e:
+                    # Configuration problems will not fix themselves on retry
+                    errors.append(LLMError(f"{provider.name}: {e}"))
+                    break
+                except Exception as e:
+                    if _is_timeout(e):
+                        # Same as our own timeout: retrying would exceed the budget
+                        breaker.record_failure()
+                        errors.append(LLMTimeoutError(f"{provider.name}: {e}"))
+                        break
+                    if not _is_transient(e):
+                        # Invalid request, auth or blocked response: retrying gives the same
+                        # result and says nothing about the backend's health
+                        errors.append(LLMError(f"{provider.name}: {e}"))
+                        break
+                    breaker.record_failure()
+                    errors.append(LLMError(f"{provider.name}: {e}"))
+                    if attempt < self.max_retries:
+                        # Full jitter backoff, never sleeping past the budget
+                        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+                        time.sleep(min(random.uniform(0, delay), max(0.0, deadline - time.monotonic())))
+            if time.monotonic() >= deadline:
+                break
+
+        message = "; ".join(str(error) for error in errors)
+        if errors and all(isinstance(error, LLMTimeoutError) for error in errors):
+            raise LLMTimeoutError(message)
+        raise LLMError(message)
+
+    def warm_up(self):
+        """Warm up every provider in the chain"""
+        for provider in self.providers:
+            provider.warm_up()
+
+    def stats(self):
+        """Return the circuit breaker state of each provider"""
+        return {
+            name: {"state": breaker.state, "failures": breaker.failures}
+            for name, breaker in self.breakers.items()
+        }
+
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    """Build the LLM client from environment variables on first use"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    provider = os.getenv("LLM_PROVIDER", "gemini").lower()
+    api_key = os.getenv("GEMINI_API_KEY")
+
+    if provider == "local":
+        providers = [LocalProvider(float(os.getenv("LLM_LOCAL_LATENCY", "0")))]
+    else:
+        models = [m.strip() for m in os.getenv("LLM_MODELS", DEFAULT_MODELS).split(",") if m.strip()]
+        providers = [GeminiProvider(model, api_key) for model in models]
+
+    return LLMClient(
+        providers,
+        timeout=float(os.getenv("LLM_TIMEOUT", DEFAULT_TIMEOUT_SECONDS)),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        hedge_after=float(os.getenv("LLM_HEDGE_AFTER", DEFAULT_HEDGE_AFTER_SECONDS)),
+        total_timeout=float(os.getenv("LLM_TOTAL_TIMEOUT", DEFAULT_TOTAL_TIMEOUT_SECONDS)),
+    )
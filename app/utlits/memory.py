@@ -0,0 +1,195 @@
+import re
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any
+
+from app.utlits.router import INDEX_ALIASES, DATE_RE, YEAR_RE
+
+# Conversation store limits
+MAX_SESSIONS = 1000
+SESSION_TTL_SECONDS = 60 * 60
+HISTORY_WINDOW = 6             # Recent turns forwarded to the LLM
+RECENT_TURN_MAX_CHARS = 600    # Per-turn cap for recent turns
+DIGEST_MAX_CHARS = 1200        # Cap on the digest of older turns
+TURN_SNIPPET_CHARS = 160       # Per-turn length kept when folding into the digest
+MAX_FACTS_PER_KIND = 12        # Most recent dates / periods kept in the facts
+
+PERIOD_RE = re.compile(
+    r"\b(?:last|past|previous|this|next)\s+(?:\d+\s+)?(?:days?|weeks?|months?|quarters?|years?|decades?)\b"
+    r"|\b(?:today|yesterday|ytd|year to date)\b"
+)
+
+# Index names and symbols, mapped to the canonical symbol
+INDEX_NAMES = dict(INDEX_ALIASES)
+for _symbol in set(INDEX_ALIASES.values()):
+    INDEX_NAMES[_symbol.lower()] = _symbol
+
+
+def _remember(values: List[str], new: List[str], limit: Optional[int] = None):
+    """Append unseen values in order, keeping only the most recent `limit`"""
+    for value in new:
+        if value in values:
+            values.remove(value)
+        values.append(value)
+    if limit is not None:
+        del values[:-limit]
+
+
+def _snippet(text: str, limit: int = TURN_SNIPPET_CHARS) -> str:
+    """Collapse whitespace and truncate text"""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit - 3].rstrip() + "..."
+
+
+class ConversationSession:
+    """
+    A single chat session: a bounded window of recent turns, a digest of older
+    ones and the facts follow-up questions depend on.
+
+    The digest is not an LLM summary, it holds one shortened line per older turn
+    and drops the oldest lines once it exceeds DIGEST_MAX_CHARS. The facts are
+    never dropped with it: the opening question, every index discussed and the
+    most recent MAX_FACTS_PER_KIND dates and periods the user mentioned, so
+    "and in 2019?" still resolves after the original question left the digest.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.digest = ""
+        self.turns: List[Dict[str, str]] = []
+        self.opening = ""
+        self.symbols: List[str] = []
+        self.dates: List[str] = []
+        self.periods: List[str] = []
+        self.last_access = time.monotonic()
+        # Requests for one session can run concurrently on worker threads
+        self._lock = threading.Lock()
+
+    def add_turn(self, role: str, content: str):
+        """Append a turn and fold anything older than the window into the digest"""
+        with self._lock:
+            self._add_turn(role, content)
+
+    def add_exchange(self, message: str, response: str):
+        """Append a user message and its answer as one step"""
+        with self._lock:
+            self._add_turn("user", message)
+            self._add_turn("assistant", response)
+
+    def _add_turn(self, role: str, content: str):
+        if role == "user":
+            self._extract_facts(content)
+        self.turns.append({"role": role, "content": content})
+        while len(self.turns) > HISTORY_WINDOW:
+            oldest = self.turns.pop(0)
+            self._fold_into_digest(oldest)
+
+    def _extract_facts(self, message: str):
+        """Record the indices, dates and periods a user message refers to"""
+        if not self.opening:
+            self.opening = _snippet(message)
+        text = message.lower().replace("'s", "")
+        words = set(re.findall(r"[a-z0-9.]+", text))
+        found = []
+        for name, symbol in INDEX_NAMES.items():
+            match = re.search(rf"\b{re.escape(name)}\b", text) if " " in name else None
+            position = match.start() if match else (text.find(name) if name in words else -1)
+            if position >= 0:
+                found.append((position, symbol))
+        _remember(self.symbols, [symbol for _, symbol in sorted(found)])
+        dates = DATE_RE.findall(text)
+        _remember(self.dates, dates + YEAR_RE.findall(DATE_RE.sub(" ", text)), MAX_FACTS_PER_KIND)
+        _remember(self.periods, PERIOD_RE.findall(text), MAX_FACTS_PER_KIND)
+
+    def _fold_into_digest(self, turn: Dict[str, str]):
+        """Add a condensed line for an old turn, dropping the oldest lines past the cap"""
+        speaker = "User" if turn["role"] == "user" else "Assistant"
+        line = f"{speaker}: {_snippet(turn['content'])}"
+        lines = self.digest.splitlines() + [line]
+        while lines and len("\n".join(lines)) > DIGEST_MAX_CHARS:
+            lines.pop(0)
+        self.digest = "\n".join(lines)
+
+    def render_history(self) -> str:
+        """Render the facts, digest and recent turns as a bounded prompt section"""
+        with self._lock:
+            parts = []
+            if self.digest:
+                # Facts only matter once turns have left the recent window
+                facts = [f"Conversation started with: {self.opening}"]
+                if self.symbols:
+                    facts.append(f"Indices discussed: {', '.join(self.symbols)}")
+                if self.dates:
+                    facts.append(f"Dates and years mentioned: {', '.join(self.dates)}")
+                if self.periods:
+                    facts.append(f"Periods mentioned: {', '.join(self.periods)}")
+                parts.append("Conversation facts:\n" + "\n".join(facts))
+                parts.append(f"Earlier conversation (shortened):\n{self.digest}")
+            if self.turns:
+                recent = "\n".join(
+                    f"{'User' if t['role'] == 'user' else 'Assistant'}: "
+                    f"{_snippet(t['content'], RECENT_TURN_MAX_CHARS)}"
+                    for t in self.turns
+                )
+                parts.append(f"Recent conversation:\n{recent}")
+            return "\n\n".join(parts)
+
+
+class ConversationStore:
+    """In-memory session store with LRU and TTL eviction"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float):
+        """Drop sessions that have not been touched within the TTL"""
+        # Sessions are kept in access order, so expired ones sit at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access < self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def get_or_create(self, session_id: Optional[str] = None) -> ConversationSession:
+        """Return the session for session_id, creating a new one if missing or expired"""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = ConversationSession(session_id or uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session.session_id)
+
+            session.last_access = now
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session, returning True if it existed"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return basic store statistics"""
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "history_window": HISTORY_WINDOW
+            }
+
+
+# Shared store used by the API process
+conversation_store = ConversationStore()
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import re
+import threading
+from datetime import date as Date
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INDEX_INFO_PATH = "app/data/indexInfo.csv"
+INDEX_DATA_PATH = "app/data/indexData.csv"
+
+# Common names people use for each index symbol
+INDEX_ALIASES = {
+    "nyse composite": "NYA", "new york stock exchange": "NYA", "nyse": "NYA",
+    "nasdaq": "IXIC",
+    "hang seng": "HSI",
+    "shanghai": "000001.SS", "sse composite": "000001.SS",
+    "nikkei": "N225",
+    "euronext": "N100", "euronext 100": "N100",
+    "shenzhen": "399001.SZ",
+    "tsx": "GSPTSE",
+    "nifty": "NSEI", "nifty 50": "NSEI",
+    "dax": "GDAXI",
+    "kospi": "KS11",
+    "smi": "SSMI",
+    "taiex": "TWII",
+    "jse": "J203.JO",
+}
+
+FIELDS = {
+    "adj close": "Adj Close", "adjusted close": "Adj Close",
+    "close": "Close", "closing": "Close",
+    "open": "Open", "opening": "Open",
+    "high": "High", "low": "Low",
+    "volume": "Volume",
+}
+
+# Questions containing these words need reasoning, not a lookup. Judgements
+# ("better", "most") and relative references ("same ... as") are included because
+# a percent change or a single attribute would not answer them.
+OPEN_ENDED_WORDS = {
+    "why", "explain", "predict", "prediction", "forecast", "should", "recommend",
+    "advice", "think", "opinion", "outlook", "future", "will", "cause", "caused",
+    "better", "worse", "best", "worst", "most", "least", "more", "less",
+    "same", "similar", "like", "than", "buy", "sell", "invest", "risk", "risky",
+}
+
+MAX_WORDS = {"highest", "max", "maximum", "peak"}
+MIN_WORDS = {"lowest", "min", "minimum", "bottom", "trough"}
+COMPARE_WORDS = {"compare", "comparison", "vs", "versus", "against"}
+RANGE_WORDS = {"between", "from", "during", "performance", "perform", "performed", "change", "return", "range"}
+ATTRIBUTE_WORDS = {"currency": "Currency", "exchange": "Exchange", "region": "Region", "country": "Region"}
+LIST_WORDS = {"list", "which", "what", "show", "indices", "indexes"}
+
+# Filler words allowed in any routed question. Every other word must belong to
+# the matched intent (keywords, index names, fields, regions) or be a number,
+# otherwise the question does not fit the pattern and goes to the LLM.
+COMMON_WORDS = {
+    "what", "which", "how", "was", "were", "is", "are", "the", "a", "an", "of", "for",
+    "on", "in", "at", "to", "and", "did", "does", "do", "me", "tell", "give", "show",
+    "please", "price", "value", "level", "index", "indices", "indexes", "stock", "market",
+    "data", "year", "its", "it", "use", "uses", "used", "trade", "trades", "traded",
+    "listed", "list", "all", "there", "until", "through", "till",
+}
+
+# Allow a few days of holidays / weekends before a looked-up date
+MAX_LOOKUP_GAP_DAYS = 5
+
+DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+YEAR_RE = re.compile(r"\b((?:19|20)\d{2})\b")
+WORD_RE = re.compile(r"[a-z0-9.]+")
+
+_load_lock = threading.Lock()
+
+
+def load_router_data() -> Dict[str, Any]:
+    """Load index metadata and per-index price history once and keep it in memory"""
+    # The lock stops warm-up and an early request from both loading the CSVs
+    with _load_lock:
+        return _load_router_data()
+
+
+@lru_cache(maxsize=1)
+def _load_router_data() -> Dict[str, Any]:
+    import pandas as pd
+
+    info_df = pd.read_csv(INDEX_INFO_PATH, encoding="utf-8-sig")
+    info = {row["Index"]: row for row in info_df.to_dict("records")}
+
+    prices = {}
+    try:
+        data_df = pd.read_csv(INDEX_DATA_PATH).dropna(
+            subset=["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+        )
+        for symbol, group in data_df.groupby("Index"):
+            prices[symbol] = group.sort_values("Date").reset_index(drop=True)
+    except Exception as e:
+        print(f"Error loading price data for router: {e}")
+
+    aliases = dict(INDEX_ALIASES)
+    for symbol in info:
+        aliases[symbol.lower()] = symbol
+        aliases[symbol.lower().split(".")[0]] = symbol
+
+    return {"info": info, "prices": prices, "aliases": aliases}
+
+
+def _find_symbols(text: str, words: List[str], aliases: Dict[str, str]) -> List[str]:
+    """Return index symbols mentioned in the message, in order of appearance"""
+    found = []
+    for alias, symbol in aliases.items():
+        if " " in alias:
+            match = re.search(rf"\b{re.escape(alias)}\b", text)
+            position = match.start() if match else -1
+        else:
+            position = text.find(alias) if alias in words else -1
+        if position >= 0:
+            found.append((position, symbol))
+    symbols = []
+    for _, symbol in sorted(found):
+        if symbol not in symbols:
+            symbols.append(symbol)
+    return symbols
+
+
+def _find_fields(text: str) -> List[str]:
+    """Return the distinct price columns the message names, in FIELDS order"""
+    columns = []
+    for word, column in FIELDS.items():
+        pattern = rf"\b{word}\b"
+        if re.search(pattern, text):
+            # Remove the match so "adj close" is not also counted as "close"
+            text = re.sub(pattern, " ", text)
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def _find_period(text: str) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """Return (start, end, explicit_dates) for the period mentioned in the message"""
+    dates = DATE_RE.findall(text)
+    if len(dates) >= 2:
+        start, end = sorted(dates[:2])
+        return start, end, dates
+    years = YEAR_RE.findall(DATE_RE.sub(" ", text))
+    if len(years) >= 2:
+        start, end = sorted(years[:2])
+        return f"{start}-01-01", f"{end}-12-31", dates
+    if len(years) == 1:
+        return f"{years[0]}-01-01", f"{years[0]}-12-31", dates
+    return None, None, dates
+
+
+def _format_value(column: str, value: float) -> str:
+    """Format a price or volume for display"""
+    if column == "Volume":
+        return f"{value:,.0f}"
+    return f"{value:,.2f}"
+
+
+def _slice(df: pd.DataFrame, start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    """Return rows between start and end inclusive (dates are ISO strings)"""
+    dates = df["Date"].values
+    lo = dates.searchsorted(start, side="left") if start else 0
+    hi = dates.searchsorted(end, side="right") if end else len(df)
+    return df.iloc[lo:hi]
+
+
+def _period_label(df: pd.DataFrame) -> str:
+    """Describe the period that was actually covered by the data"""
+    return f"{df['Date'].iloc[0]} to {df['Date'].iloc[-1]}"
+
+
+def _answer_attribute(symbols: List[str], column: str, info: Dict[str, Dict]) -> Dict[str, Any]:
+    """Answer currency / exchange / region questions from indexInfo.csv"""
+    label = column.lower()
+    lines = [f"{symbol} {label}: {info[symbol][column]}" for symbol in symbols]
+    return {
+        "response": "\n".join(lines),
+        "data": {"index_info": [info[symbol] for symbol in symbols]}
+    }
+
+
+def _answer_region(region: str, info: Dict[str, Dict]) -> Dict[str, Any]:
+    """List indices whose region matches"""
+    matches = [row for row in info.values() if region.lower() in row["Region"].lower()]
+    lines = [f"- {row['Index']} ({row['Exchange']}, {row['Currency']})" for row in matches]
+    return {
+        "response": f"Indices in {matches[0]['Region']}:\n" + "\n".join(lines),
+        "data": {"index_info": matches}
+    }
+
+
+def _fits_pattern(words: List[str], vocabulary: set) -> bool:
+    """True if every word is a number, a common filler word or in the intent vocabulary"""
+    return all(word.isdigit() or word in COMMON_WORDS or word in vocabulary for word in words)
+
+
+def _answer_lookup(symbol: str, date: str, column: str, df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """Return the value of a column on (or a few days before) the requested date"""
+    first_date = df["Date"].iloc[0]
+    last_date = df["Date"].iloc[-1]
+    if date < first_date or date > last_date:
+        return {
+            "response": f"No {symbol} data for {date}: the data covers {first_date} to {last_date}.",
+            "data": None
+        }
+    position = df["Date"].values.searchsorted(date, side="right") - 1
+    row = df.iloc[position]
+    gap = (Date.fromisoformat(date) - Date.fromisoformat(row["Date"])).days
+    if gap > MAX_LOOKUP_GAP_DAYS:
+        return {
+            "response": (
+                f"No {symbol} trading data for {date}: the nearest earlier trading day "
+                f"is {row['Date']}, {gap} days before."
+            ),
+            "data": None
+        }
+    response = f"{symbol} {column.lower()} on {row['Date']}: {_format_value(column, row[column])}"
+    if row["Date"] != date:
+        response += f" (no trading data for {date}, showing the previous trading day)"
+    return {"response": response, "data": {"stock_data": [row.to_dict()]}}
+
+
+def _answer_extreme(symbol: str, column: str, highest: bool, df: pd.DataFrame,
+                    start: Optional[str], end: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return the highest or lowest value of a column over a period"""
+    period = _slice(df, start, end)
+    if period.empty:
+        return None
+    row = period.loc[period[column].idxmax() if highest else period[column].idxmin()]
+    kind = "Highest" if highest else "Lowest"
+    return {
+        "response": (
+            f"{kind} {symbol} {column.lower()} ({_period_label(period)}): "
+            f"{_format_value(column, row[column])} on {row['Date']}"
+        ),
+        "data": {"stock_data": [row.to_dict()]}
+    }
+
+
+def _period_stats(df: pd.DataFrame, column: str) -> Dict[str, Any]:
+    """First, last, percentage change, high and low of a column over a slice"""
+    first = df[column].iloc[0]
+    last = df[column].iloc[-1]
+    return {
+        "first": first,
+        "last": last,
+        "change_pct": (last - first) / first * 100 if first else 0.0,
+        "high": df[column].max(),
+        "low": df[column].min(),
+    }
+
+
+def _answer_range(symbol: str, column: str, df: pd.DataFrame,
+                  start: Optional[str], end: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Summarise how an index moved over a period"""
+    period = _slice(df, start, end)
+    if period.empty:
+        return None
+    stats = _period_stats(period, column)
+    return {
+        "response": (
+            f"{symbol} {column.lower()} from {_period_label(period)}: "
+            f"{_format_value(column, stats['first'])} -> {_format_value(column, stats['last'])} "
+            f"({stats['change_pct']:+.2f}%), high {_format_value(column, stats['high'])}, "
+            f"low {_format_value(column, stats['low'])}, {len(period)} trading days"
+        ),
+        "data": {"stock_data": [period.iloc[0].to_dict(), period.iloc[-1].to_dict()]}
+    }
+
+
+def _answer_compare(symbols: List[str], column: str, prices: Dict[str, pd.DataFrame],
+                    start: Optional[str], end: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Compare percentage change of several indices over the same period"""
+    # Clip every index to the dates they all cover so the changes are comparable
+    periods = [_slice(prices[symbol], start, end) for symbol in symbols]
+    if any(period.empty for period in periods):
+        return None
+    common_start = max(period["Date"].iloc[0] for period in periods)
+    common_end = min(period["Date"].iloc[-1] for period in periods)
+    if common_start > common_end:
+        return None
+    periods = [_slice(period, common_start, common_end) for period in periods]
+
+    lines = []
+    rows = []
+    for symbol, period in zip(symbols, periods):
+        stats = _period_stats(period, column)
+        lines.append(
+            f"- {symbol}: {stats['change_pct']:+.2f}% "
+            f"({_format_value(column, stats['first'])} -> {_format_value(column, stats['last'])})"
+        )
+        rows.extend([period.iloc[0].to_dict(), period.iloc[-1].to_dict()])
+    return {
+        "response": (
+            f"{column} change comparison ({common_start} to {common_end}):\n" + "\n".join(lines)
+        ),
+        "data": {"stock_data": rows}
+    }
+
+
+def route_message(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Answer simple data questions directly from the in-memory datasets.
+
+    Returns a dict with "response", "data" and "intent", or None when the
+    message is open-ended and should go to the LLM.
+    """
+    try:
+        router_data = load_router_data()
+    except Exception as e:
+        print(f"Error loading router data: {e}")
+        return None
+
+    text = message.lower().replace("'s", "")
+    words = [word.strip(".") for word in WORD_RE.findall(text)]
+    word_set = set(words)
+    if word_set & OPEN_ENDED_WORDS:
+        return None
+
+    info = router_data["info"]
+    prices = router_data["prices"]
+    symbols = _find_symbols(text, words, router_data["aliases"])
+    start, end, dates = _find_period(text)
+
+    # Words that name things: index aliases, price fields and regions
+    name_words = {part for alias in router_data["aliases"] for part in WORD_RE.findall(alias)}
+    field_words = {part for field in FIELDS for part in field.split()}
+    region_words = {part for row in info.values() for part in WORD_RE.findall(row["Region"].lower())}
+
+    result = None
+    intent = None
+    try:
+        attributes = [column for word, column in ATTRIBUTE_WORDS.items() if word in word_set]
+        if symbols and attributes and not dates and not start:
+            if not _fits_pattern(words, name_words | set(ATTRIBUTE_WORDS)):
+                return None
+            intent = "attribute"
+            result = _answer_attribute(symbols, attributes[0], info)
+
+        elif not symbols and word_set & LIST_WORDS and ("indices" in word_set or "indexes" in word_set):
+            regions = {row["Region"].lower() for row in info.values()}
+            region = next((r for r in sorted(regions, key=len, reverse=True) if r in text), None)
+            if region and _fits_pattern(words, region_words | LIST_WORDS):
+                intent = "region"
+                result = _answer_region(region, info)
+
+        elif symbols and all(symbol in prices for symbol in symbols):
+            columns = _find_fields(text)
+            if len(columns) > 1:
+                # Every answer reports one column; "open high low close" would lose the rest
+                return None
+            column = columns[0] if columns else "Close"
+            vocabulary = name_words | field_words
+            if len(dates) == 1:
+                # A single day only answers a lookup; comparisons and extremes need a
+                # period, and a date plus a separate year is ambiguous
+                if len(symbols) != 1 or start or word_set & (COMPARE_WORDS | MAX_WORDS | MIN_WORDS):
+                    return None
+                if not _fits_pattern(words, vocabulary):
+                    return None
+                intent = "lookup"
+                result = _answer_lookup(symbols[0], dates[0], column, prices[symbols[0]])
+            elif len(symbols) >= 2 and word_set & COMPARE_WORDS:
+                if not _fits_pattern(words, vocabulary | COMPARE_WORDS | RANGE_WORDS):
+                    return None
+                intent = "compare"
+                result = _answer_compare(symbols, column, prices, start, end)
+            elif len(symbols) == 1 and word_set & (MAX_WORDS | MIN_WORDS):
+                if not _fits_pattern(words, vocabulary | MAX_WORDS | MIN_WORDS | RANGE_WORDS):
+                    return None
+                intent = "extreme"
+                highest = bool(word_set & MAX_WORDS)
+                result = _answer_extreme(symbols[0], column, highest, prices[symbols[0]], start, end)
+            elif len(symbols) == 1 and start and word_set & RANGE_WORDS:
+                if not _fits_pattern(words, vocabulary | RANGE_WORDS):
+                    return None
+                intent = "range"
+                result = _answer_range(symbols[0], column, prices[symbols[0]], start, end)
+    except Exception as e:
+        print(f"Error answering {intent} intent: {e}")
+        return None
+
+    if result is None:
+        return None
+    result["intent"] = intent
+    return result
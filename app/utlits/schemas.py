@@ -4,12 +4,14 @@ from typing import Optional, List, Dict, Any
 class ChatRequest(BaseModel):
     message: str
     context: Optional[str] = None
+    session_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
     data: Optional[Dict[str, Any]] = None
     success: bool = True
     error: Optional[str] = None
+    session_id: Optional[str] = None
 
 class IndexInfo(BaseModel):
     region: str
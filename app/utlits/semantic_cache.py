@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import zlib
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from app.utlits.router import INDEX_ALIASES
+
+# Semantic cache settings
+EMBEDDING_DIM = 512
+CACHE_CAPACITY = 2000
+SIMILARITY_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.7"))
+DATASET_PATHS = (
+    "app/data/indexInfo.csv",
+    "app/data/indexData.csv",
+    "app/data/indexProcessed.csv",
+)
+
+# Filler words ignored when matching. Everything else, including negations,
+# price fields and prepositions like before/after/since, must match exactly.
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "for", "to", "in", "on",
+    "and", "or", "me", "about", "please", "can", "you", "tell", "what", "which", "how",
+    "did", "does", "do", "has", "have", "had", "it", "its", "i", "my", "with", "give",
+    "show", "explain", "describe", "index", "go", "goes", "went",
+}
+
+SUFFIXES = ("ance", "ing", "ed", "es", "s")
+
+# Words with the same meaning in these questions, folded into one token
+SYNONYMS = {
+    "do": "perform", "doing": "perform", "performance": "perform", "performed": "perform",
+    "performing": "perform", "return": "perform", "returns": "perform",
+    "vs": "compare", "versus": "compare", "comparison": "compare",
+    "rise": "rise", "rose": "rise", "risen": "rise", "rising": "rise", "up": "rise",
+    "gain": "rise", "gained": "rise", "gains": "rise", "increase": "rise", "increased": "rise",
+    "fall": "fall", "fell": "fall", "falling": "fall", "down": "fall", "drop": "fall",
+    "dropped": "fall", "decline": "fall", "declined": "fall",
+    "trading": "trade", "trades": "trade", "traded": "trade",
+    "volatility": "volatile", "opening": "open", "closing": "close",
+    "n't": "not", "never": "not", "no": "not",
+}
+
+# Words that point back at earlier turns: "why did it fall?", "and the same for 2019?"
+REFERENCE_WORDS = {
+    "it", "its", "that", "this", "these", "those", "they", "them", "their", "there",
+    "then", "same", "also", "too", "else", "again", "above", "previous", "earlier",
+}
+FOLLOW_UP_OPENINGS = ("and ", "but ", "so ", "what about ", "how about ")
+# Questions shorter than this that name no index, region or number are treated as follow-ups
+MIN_STANDALONE_TOKENS = 3
+
+TOKEN_RE = re.compile(r"n't|[a-z0-9.\-]+")
+NUMBER_RE = re.compile(r"^\d[\d.\-]*$")
+
+# Index names and symbols, mapped to the canonical symbol
+INDEX_NAMES = dict(INDEX_ALIASES)
+for _symbol in set(INDEX_ALIASES.values()):
+    INDEX_NAMES[_symbol.lower()] = _symbol
+    INDEX_NAMES[_symbol.lower().split(".")[0]] = _symbol
+
+REGION_WORDS = {
+    "asia", "asian", "europe", "european", "america", "american", "us", "usa", "africa",
+    "china", "chinese", "japan", "japanese", "india", "indian", "germany", "german",
+    "canada", "canadian", "korea", "korean", "switzerland", "swiss", "taiwan", "hong",
+    "uk", "britain", "british",
+}
+
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so "performance" and "perform" share features"""
+    for suffix in SUFFIXES:
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def _words(text: str) -> List[str]:
+    """Lowercase and tokenize, rewriting index names to their symbol"""
+    lowered = text.lower().replace("'s", "").replace("cannot", "can n't").replace("n't", " n't")
+    for name, symbol in INDEX_NAMES.items():
+        if " " in name:
+            lowered = re.sub(rf"\b{re.escape(name)}\b", symbol.lower(), lowered)
+    words = [word.strip(".-") for word in TOKEN_RE.findall(lowered)]
+    return [INDEX_NAMES.get(word, word).lower() for word in words if word]
+
+
+def _tokens(text: str) -> List[str]:
+    """Tokenize, drop stopwords, fold synonyms and stem"""
+    return [
+        _stem(SYNONYMS.get(word, word)) for word in _words(text)
+        if word in SYNONYMS or word not in STOPWORDS
+    ]
+
+
+def _bucket(feature: str) -> int:
+    """Stable hash of a feature into the embedding space"""
+    return zlib.crc32(feature.encode("utf-8")) % EMBEDDING_DIM
+
+
+def embed(text: str) -> np.ndarray:
+    """Embed text with a hashed word + character n-gram vectorizer (L2 normalized)"""
+    import numpy as np
+
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    words = _tokens(text)
+    for word in words:
+        vector[_bucket(f"w:{word}")] += 2.0
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            vector[_bucket(f"c:{padded[i:i + 3]}")] += 1.0
+    for first, second in zip(words, words[1:]):
+        vector[_bucket(f"b:{first} {second}")] += 1.0
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def match_key(text: str) -> Tuple[str, ...]:
+    """
+    Every word outside STOPWORDS (after folding synonyms and stemming). Both
+    questions must have the same key for a cache hit, so "HSI close in 2019"
+    is not served the answer for 2020, "opening" for "closing", "before" for
+    "after" or "volatile" for "not volatile".
+    """
+    return tuple(sorted(set(_tokens(text))))
+
+
+def is_standalone(text: str) -> bool:
+    """
+    True if a question can be answered without the conversation before it.
+
+    Questions that refer back ("why did it fall?", "what about 2019?") or are
+    short and name no index, region or number depend on history, so they must
+    not be served, or stored as, a cached answer.
+    """
+    words = _words(text)
+    if not words or REFERENCE_WORDS & set(words):
+        return False
+    if f"{' '.join(words)} ".startswith(FOLLOW_UP_OPENINGS):
+        return False
+    symbols = {symbol.lower() for symbol in INDEX_NAMES.values()}
+    if any(NUMBER_RE.match(word) or word in symbols or word in REGION_WORDS for word in words):
+        return True
+    return len(_tokens(text)) >= MIN_STANDALONE_TOKENS
+
+
+def dataset_version(paths: Tuple[str, ...] = DATASET_PATHS) -> str:
+    """Fingerprint of the data files; changes whenever a file is replaced or edited"""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:missing")
+    return "|".join(parts)
+
+
+class SemanticCache:
+    """Brute-force NumPy nearest-neighbour cache of chat answers"""
+
+    def __init__(self, capacity: int = CACHE_CAPACITY, threshold: float = SIMILARITY_THRESHOLD):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._reset(dataset_version())
+
+    def _reset(self, version: str):
+        """Drop all entries and start over for a dataset version"""
+        self.version = version
+        # Allocated on first store so numpy is not imported with the API
+        self._vectors = None
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self._size = 0
+        self._next = 0
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    def _check_version(self):
+        """Invalidate the cache if the dataset changed on disk"""
+        version = dataset_version()
+        if version != self.version:
+            self._reset(version)
+
+    def lookup(self, message: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry closest to message if it clears the threshold"""
+        import numpy as np
+
+        started = time.perf_counter()
+        query = embed(message)
+        key = match_key(message)
+        with self._lock:
+            self._check_version()
+            entry = None
+            if self._size:
+                scores = self._vectors[:self._size] @ query
+                for position in np.argsort(scores)[::-1][:5]:
+                    if scores[position] < self.threshold:
+                        break
+                    candidate = self._entries[position]
+                    if candidate["key"] == key:
+                        entry = dict(candidate, similarity=float(scores[position]))
+                        break
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.saved_seconds += entry["llm_seconds"]
+                self.saved_tokens += entry["tokens"]
+            self.lookup_seconds += time.perf_counter() - started
+            return entry
+
+    def store(self, message: str, response: str, data: Optional[Dict[str, Any]] = None,
+              llm_seconds: float = 0.0, prompt_chars: int = 0):
+        """Add an answer to the cache, overwriting the oldest entry when full"""
+        import numpy as np
+
+        vector = embed(message)
+        with self._lock:
+            self._check_version()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, EMBEDDING_DIM), dtype=np.float32)
+            position = self._next
+            self._vectors[position] = vector
+            self._entries[position] = {
+                "message": message,
+                "key": match_key(message),
+                "response": response,
+                "data": data,
+                "llm_seconds": llm_seconds,
+                # Rough token estimate (~4 characters per token) for prompt + answer
+                "tokens": (prompt_chars + len(response)) // 4,
+            }
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        """Drop all entries and reset statistics"""
+        with self._lock:
+            self._reset(dataset_version())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate and savings statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "avg_lookup_ms": self.lookup_seconds / lookups * 1000 if lookups else 0.0,
+                "llm_seconds_saved": round(self.saved_seconds, 3),
+                "estimated_tokens_saved": self.saved_tokens,
+            }
+
+
+# Shared cache used by the API process
+semantic_cache = SemanticCache()
@@ -0,0 +1,148 @@
+"""
+Semantic cache benchmark.
+
+Replays a workload of questions and paraphrases through the semantic cache
+and reports hit rate, lookup latency and the LLM time / tokens avoided.
+No Gemini calls are made; each miss is charged a simulated LLM latency.
+It also scores a labelled set of same / different-meaning pairs across a
+range of thresholds, and fails if any different-meaning question is served
+a cached answer.
+
+Run from the repository root:
+    python -m benchmarks.semantic_cache_benchmark
+"""
+import argparse
+import sys
+import time
+
+from app.utlits.semantic_cache import SemanticCache, embed, match_key
+
+# Each group is one question followed by paraphrases a user might send later
+WORKLOAD = [
+    ["How did the Nikkei perform?", "Nikkei performance?", "How has the Nikkei performed"],
+    ["What is the outlook for the Hang Seng?", "Hang Seng outlook", "HSI outlook please"],
+    ["Tell me about the NYA index", "Tell me about NYA", "tell me about the NYA index please"],
+    ["Which indices trade in Europe?", "What indices trade in Europe", "Indices trading in Europe?"],
+    ["Explain the DAX trend in 2020", "DAX trend in 2020", "Explain GDAXI trend in 2020"],
+    ["Compare NASDAQ and NYSE", "NASDAQ vs NYSE", "Compare IXIC and NYA"],
+    ["What is the best performing index?"],
+    ["Which index in Asia is the most volatile?"],
+    ["Explain the DAX trend in the last decade"],
+    ["Why did the Nasdaq rise?"],
+    ["Should I buy HSI?"],
+    ["Why is HSI volatile?"],
+    ["What was the HSI opening price in 2020?"],
+    ["How did the Hang Seng perform before the crisis?"],
+    ["How did the Hang Seng perform in 2020?"],
+    ["Explain the Nikkei trend"],
+]
+
+# Near misses that must NOT be served from the cache, each one is close to a
+# question above but asks something different
+NEAR_MISSES = [
+    "Explain the DAX trend in 2019",
+    "Tell me about the HSI index",
+    "What is the worst performing index?",
+    "Which index in Europe is the most volatile?",
+    "Which index in Asia is the least volatile?",
+    "Explain the DAX trend in the last year",
+    "Explain the DAX trend in the next decade",
+    "Why did the Nasdaq fall?",
+    "Should I sell HSI?",
+    "What affects stock markets?",
+    "How do interest rates affect markets?",
+    "Why is HSI not volatile?",
+    "What was the HSI closing price in 2020?",
+    "How did the Hang Seng perform after the crisis?",
+    "How did the Hang Seng perform since 2020?",
+    "Explain the Nikkei trend in dollars",
+]
+
+# Labelled pairs used to tune SEMANTIC_CACHE_THRESHOLD: (question, question, same meaning)
+LABELLED_PAIRS = [
+    ("How did the Nikkei do?", "Nikkei performance?", True),
+    ("How did the Nikkei perform?", "How has the Nikkei performed", True),
+    ("What is the outlook for the Hang Seng?", "Hang Seng outlook", True),
+    ("Tell me about the NYA index", "tell me about the NYA index please", True),
+    ("Which indices trade in Europe?", "What indices trade in Europe", True),
+    ("Explain the DAX trend in 2020", "DAX trend in 2020", True),
+    ("Compare NASDAQ and NYSE", "Compare IXIC and NYA", True),
+    ("Why did the Nasdaq rise?", "Why did the Nasdaq go up?", True),
+    ("What is the best performing index?", "What is the worst performing index?", False),
+    ("Which index in Asia is the most volatile?", "Which index in Europe is the most volatile?", False),
+    ("Which index in Asia is the most volatile?", "Which index in Asia is the least volatile?", False),
+    ("Explain the DAX trend in the last decade", "Explain the DAX trend in the last year", False),
+    ("Explain the DAX trend in 2020", "Explain the DAX trend in 2019", False),
+    ("Why did the Nasdaq rise?", "Why did the Nasdaq fall?", False),
+    ("Should I buy HSI?", "Should I sell HSI?", False),
+    ("Tell me about the NYA index", "Tell me about the HSI index", False),
+    ("What affects stock markets?", "How do interest rates affect markets?", False),
+    ("Why is HSI volatile?", "Why is HSI not volatile?", False),
+    ("Why is HSI volatile?", "Why isn't HSI volatile?", False),
+    ("What was the HSI opening price in 2020?", "What was the HSI closing price in 2020?", False),
+    ("How did the Hang Seng perform before the crisis?", "How did the Hang Seng perform after the crisis?", False),
+    ("How did the Hang Seng perform in 2020?", "How did the Hang Seng perform since 2020?", False),
+    ("Explain the Nikkei trend", "Explain the Nikkei trend in dollars", False),
+]
+
+
+def sweep_thresholds():
+    """Print hits on same-meaning pairs and false hits on different-meaning pairs per threshold"""
+    scored = [
+        (float(embed(a) @ embed(b)), match_key(a) == match_key(b), same)
+        for a, b, same in LABELLED_PAIRS
+    ]
+    positives = sum(1 for _, _, same in scored if same)
+    print("Threshold sweep on labelled pairs:")
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+        hits = [same for similarity, key_match, same in scored if key_match and similarity >= threshold]
+        print(f"  {threshold:.1f}: {sum(hits)}/{positives} paraphrases hit, "
+              f"{len(hits) - sum(hits)} wrong answers served")
+    print()
+
+
+def run(llm_seconds: float, prompt_chars: int, cost_per_1k_tokens: float, repeats: int) -> bool:
+    cache = SemanticCache()
+    queries = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for group in WORKLOAD:
+            for question in group:
+                queries += 1
+                if cache.lookup(question) is None:
+                    cache.store(question, f"Answer to: {question}", None, llm_seconds, prompt_chars)
+    elapsed = time.perf_counter() - started
+    stats = cache.stats()
+
+    wrong = []
+    for question in NEAR_MISSES:
+        entry = cache.lookup(question)
+        if entry is not None:
+            wrong.append((question, entry["message"]))
+
+    baseline_seconds = queries * llm_seconds
+    print(f"Queries:                 {queries}")
+    print(f"Cache entries:           {stats['entries']}")
+    print(f"Hit rate:                {stats['hit_rate']:.1%}")
+    print(f"Avg lookup latency:      {stats['avg_lookup_ms']:.3f} ms")
+    print(f"Total cache overhead:    {elapsed * 1000:.1f} ms")
+    print(f"LLM time without cache:  {baseline_seconds:.1f} s")
+    print(f"LLM time avoided:        {stats['llm_seconds_saved']:.1f} s")
+    print(f"Tokens avoided (est.):   {stats['estimated_tokens_saved']:,}")
+    print(f"Cost avoided (est.):     ${stats['estimated_tokens_saved'] / 1000 * cost_per_1k_tokens:.4f}")
+    print(f"Near misses served:      {len(wrong)}/{len(NEAR_MISSES)}")
+    for question, cached in wrong:
+        print(f"  WRONG: \"{question}\" got the answer for \"{cached}\"")
+    return not wrong
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the chat semantic cache")
+    parser.add_argument("--llm-seconds", type=float, default=1.5, help="Simulated LLM latency per miss")
+    parser.add_argument("--prompt-chars", type=int, default=900, help="Prompt size sent to the LLM per miss")
+    parser.add_argument("--cost-per-1k-tokens", type=float, default=0.0004, help="LLM price per 1k tokens")
+    parser.add_argument("--repeats", type=int, default=1, help="Times to replay the workload")
+    args = parser.parse_args()
+    sweep_thresholds()
+    if not run(args.llm_seconds, args.prompt_chars, args.cost_per_1k_tokens, args.repeats):
+        sys.exit(1)
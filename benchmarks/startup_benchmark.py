@@ -0,0 +1,105 @@
+"""
+API cold-start benchmark.
+
+Measures, in fresh interpreter processes:
+  - time to `import app.main` (median over several runs)
+  - which heavy modules are loaded by that import (should be none)
+  - the slowest imports, from `python -X importtime`
+  - time from launching uvicorn until /health answers
+
+Run from the repository root:
+    python -m benchmarks.startup_benchmark
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+HEAVY_MODULES = ["pandas", "numpy", "google.generativeai", "uvicorn", "streamlit", "plotly"]
+
+IMPORT_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure_import(runs: int):
+    times = []
+    loaded = ""
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        times.append(float(output[0]) * 1000)
+        loaded = output[1] if len(output) > 1 else ""
+    return times, loaded
+
+
+def import_profile(top: int):
+    """Return the slowest modules by cumulative import time"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def time_to_healthy(timeout: float) -> float:
+    """Launch uvicorn and return milliseconds until /health returns 200"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("API did not become healthy in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark API cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-process import runs")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--no-serve", action="store_true", help="Skip the uvicorn time-to-healthy check")
+    args = parser.parse_args()
+
+    times, loaded = measure_import(args.runs)
+    print(f"import app.main:   median {statistics.median(times):.0f} ms, "
+          f"min {min(times):.0f} ms over {args.runs} runs")
+    print(f"Heavy modules loaded at import: {loaded or 'none'}")
+
+    print("\nSlowest imports (cumulative / self, ms):")
+    for cumulative_us, self_us, name in import_profile(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name}")
+
+    if not args.no_serve:
+        # Warm-up runs in the background by default, so /health should not wait for it
+        os.environ.setdefault("APP_WARMUP", "background")
+        print(f"\nuvicorn start -> /health OK: {time_to_healthy(30):.0f} ms")
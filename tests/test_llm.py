@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from app.utlits import llm
+from app.utlits.llm import LLMClient, LLMError, LLMProvider, LLMTimeoutError
+
+
+class StatusError(Exception):
+    """Stand-in for a google.api_core exception carrying an HTTP status"""
+
+    def __init__(self, code: int):
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+class FakeProvider(LLMProvider):
+    """
+    Plays back a script of results: a string is returned, an exception raised.
+    The last entry repeats. `latency` is seconds per call, or a list per call.
+    """
+
+    def __init__(self, name, script=None, latency=0.0):
+        self.name = name
+        self.script = list(script or ["ok"])
+        self.latencies = list(latency) if isinstance(latency, list) else [latency]
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, timeout):
+        with self._lock:
+            self.calls += 1
+            outcome = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+            latency = self.latencies.pop(0) if len(self.latencies) > 1 else self.latencies[0]
+        if latency:
+            time.sleep(latency)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm, "BACKOFF_BASE_SECONDS", 0.0)
+
+
+def test_transient_errors_are_retried():
+    provider = FakeProvider("a", [StatusError(503), ConnectionError("reset"), "ok"])
+    assert LLMClient([provider], max_retries=2).generate("hi") == "ok"
+    assert provider.calls == 3
+
+
+def test_non_transient_error_falls_back_without_retry():
+    primary = FakeProvider("a", [StatusError(400)])
+    fallback = FakeProvider("b", ["fallback"])
+    client = LLMClient([primary, fallback], max_retries=2)
+    assert client.generate("hi") == "fallback"
+    assert primary.calls == 1
+    assert client.breakers["a"].failures == 0
+
+
+def test_retries_exhausted_falls_back():
+    primary = FakeProvider("a", [StatusError(500)])
+    fallback = FakeProvider("b", ["fallback"])
+    client = LLMClient([primary, fallback], max_retries=1)
+    assert client.generate("hi") == "fallback"
+    assert primary.calls == 2
+
+
+def test_slow_provider_times_out_and_falls_back():
+    slow = FakeProvider("a", ["late"], latency=0.5)
+    fallback = FakeProvider("b", ["fallback"])
+    assert LLMClient([slow, fallback], timeout=0.1).generate("hi") == "fallback"
+    assert slow.calls == 1
+
+
+@pytest.mark.parametrize("error", [StatusError(504), StatusError(408), TimeoutError("deadline")])
+def test_backend_deadline_is_a_timeout(error):
+    provider = FakeProvider("a", [error])
+    client = LLMClient([provider], max_retries=2)
+    with pytest.raises(LLMTimeoutError):
+        client.generate("hi")
+    assert provider.calls == 1
+    assert client.breakers["a"].failures == 1
+
+
+def test_mixed_failures_raise_llm_error():
+    client = LLMClient([FakeProvider("a", [StatusError(504)]), FakeProvider("b", [StatusError(400)])])
+    with pytest.raises(LLMError) as raised:
+        client.generate("hi")
+    assert not isinstance(raised.value, LLMTimeoutError)
+
+
+def test_hedged_request_returns_the_faster_reply():
+    # The first call is slow, the hedged duplicate answers immediately
+    provider = FakeProvider("a", ["slow", "fast"], latency=[0.5, 0.0])
+    client = LLMClient([provider], timeout=2.0, hedge_after=0.05)
+    started = time.monotonic()
+    assert client.generate("hi") == "fast"
+    assert time.monotonic() - started < 0.4
+    assert provider.calls == 2
+
+
+def test_circuit_breaker_skips_failing_provider():
+    primary = FakeProvider("a", [StatusError(503)])
+    fallback = FakeProvider("b", ["fallback"])
+    client = LLMClient([primary, fallback], max_retries=0)
+    client.breakers["a"] = llm.CircuitBreaker(failure_threshold=2, reset_seconds=60)
+
+    client.generate("hi")
+    client.generate("hi")
+    assert client.stats()["a"]["state"] == "open"
+    assert client.generate("hi") == "fallback"
+    assert primary.calls == 2
+
+
+def test_total_budget_stops_the_chain():
+    slow = FakeProvider("a", ["late"], latency=0.5)
+    never_called = FakeProvider("b", ["fallback"])
+    client = LLMClient([slow, never_called], timeout=1.0, total_timeout=0.1)
+    with pytest.raises(LLMTimeoutError):
+        client.generate("hi")
+    assert never_called.calls == 0
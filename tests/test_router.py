@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from app.utlits import router
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE_DATA = Path(__file__).resolve().parent / "data" / "indexData.csv"
+
+
+@pytest.fixture(autouse=True)
+def fixture_data(monkeypatch):
+    """Point the router at the small fixture CSV (HSI has a Lunar New Year gap)"""
+    monkeypatch.setattr(router, "INDEX_INFO_PATH", str(ROOT / "app" / "data" / "indexInfo.csv"))
+    monkeypatch.setattr(router, "INDEX_DATA_PATH", str(FIXTURE_DATA))
+    router._load_router_data.cache_clear()
+    yield
+    router._load_router_data.cache_clear()
+
+
+def test_lookup():
+    result = router.route_message("What was the HSI close on 2020-03-16?")
+    assert result["intent"] == "lookup"
+    assert result["response"] == "HSI close on 2020-03-16: 80.00"
+
+
+def test_lookup_named_field():
+    assert router.route_message("HSI open on 2020-03-16")["response"] == "HSI open on 2020-03-16: 79.00"
+    assert router.route_message("HSI volume on 2020-03-16")["response"] == "HSI volume on 2020-03-16: 9,000"
+
+
+def test_lookup_adj_close_counts_as_one_field():
+    result = router.route_message("HSI adj close on 2020-03-16")
+    assert result["response"] == "HSI adj close on 2020-03-16: 80.00"
+
+
+def test_lookup_weekend_uses_previous_trading_day():
+    result = router.route_message("HSI close on 2020-03-15")
+    assert result["response"].startswith("HSI close on 2020-03-13: 90.00")
+    assert "previous trading day" in result["response"]
+
+
+def test_lookup_holiday_gap():
+    result = router.route_message("HSI close on 2020-02-01")
+    assert result["intent"] == "lookup"
+    assert result["data"] is None
+    assert "nearest earlier trading day is 2020-01-23, 9 days before" in result["response"]
+
+
+@pytest.mark.parametrize("date", ["2019-12-31", "2021-01-04"])
+def test_lookup_out_of_range(date):
+    result = router.route_message(f"HSI close on {date}")
+    assert result["data"] is None
+    assert result["response"] == f"No HSI data for {date}: the data covers 2020-01-20 to 2020-03-17."
+
+
+def test_extreme():
+    lowest = router.route_message("What was the lowest close of HSI in 2020?")
+    assert lowest["intent"] == "extreme"
+    assert lowest["response"] == "Lowest HSI close (2020-01-20 to 2020-03-17): 80.00 on 2020-03-16"
+    highest = router.route_message("highest HSI high between 2020-02-01 and 2020-03-31")
+    assert highest["response"] == "Highest HSI high (2020-02-03 to 2020-03-17): 104.00 on 2020-02-04"
+
+
+def test_range():
+    result = router.route_message("How did HSI perform in 2020?")
+    assert result["intent"] == "range"
+    assert result["response"].startswith("HSI close from 2020-01-20 to 2020-03-17: 110.00 -> 85.00 (-22.73%)")
+    assert result["response"].endswith("10 trading days")
+
+
+def test_compare_uses_common_range():
+    result = router.route_message("Compare HSI and N225 in 2020")
+    assert result["intent"] == "compare"
+    assert result["response"].startswith("Close change comparison (2020-01-22 to 2020-03-17):")
+    assert "- HSI: -19.81% (106.00 -> 85.00)" in result["response"]
+    assert "- N225: -5.00% (200.00 -> 190.00)" in result["response"]
+
+
+def test_attribute():
+    result = router.route_message("What currency does HSI use?")
+    assert result["intent"] == "attribute"
+    assert result["response"] == "HSI currency: HKD"
+
+
+def test_region():
+    result = router.route_message("Which indices are in Japan?")
+    assert result["intent"] == "region"
+    assert "N225" in result["response"]
+
+
+@pytest.mark.parametrize("message", [
+    # open-ended words
+    "Why did HSI fall on 2020-03-16?",
+    "Should I buy HSI in 2020?",
+    "Which index performed best in 2020?",
+    # extra words outside the pattern
+    "What was the HSI close on 2020-03-16 after the news?",
+    "How did HSI perform in 2020 during the pandemic?",
+    # a single date cannot answer compare / extreme / range
+    "compare HSI and N225 on 2020-03-16",
+    "what was the lowest close of HSI on 2020-03-16",
+    "highest HSI close on 2020-03-16 in 2020",
+    # several fields in one question
+    "HSI open high low close on 2020-03-16",
+    # no date or period at all
+    "HSI close",
+])
+def test_refusals(message):
+    assert router.route_message(message) is None
@@ -0,0 +1,42 @@
+import pytest
+
+from app.utlits.semantic_cache import SemanticCache, is_standalone, match_key
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Why is HSI volatile?", "Why is HSI not volatile?"),
+    ("Why is HSI volatile?", "Why isn't HSI volatile?"),
+    ("What was the HSI opening price in 2020?", "What was the HSI closing price in 2020?"),
+    ("How did the Hang Seng perform before the crisis?", "How did the Hang Seng perform after the crisis?"),
+    ("How did the Hang Seng perform in 2020?", "How did the Hang Seng perform since 2020?"),
+    ("Explain the Nikkei trend", "Explain the Nikkei trend in dollars"),
+    ("Explain the DAX trend in 2020", "Explain the DAX trend in 2019"),
+])
+def test_different_meaning_is_not_served(first, second):
+    cache = SemanticCache(capacity=8)
+    cache.store(first, "answer")
+    assert cache.lookup(second) is None
+
+
+@pytest.mark.parametrize("first, second", [
+    ("How did the Nikkei perform?", "How has the Nikkei performed"),
+    ("What is the outlook for the Hang Seng?", "HSI outlook please"),
+    ("Why did the Nasdaq rise?", "Why did the Nasdaq go up?"),
+])
+def test_paraphrase_is_served(first, second):
+    cache = SemanticCache(capacity=8)
+    cache.store(first, "answer")
+    assert match_key(first) == match_key(second)
+    assert cache.lookup(second)["response"] == "answer"
+
+
+@pytest.mark.parametrize("message, standalone", [
+    ("Why is HSI volatile?", True),
+    ("What affects stock markets?", True),
+    ("Why did it fall?", False),
+    ("What about 2019?", False),
+    ("And in dollars?", False),
+    ("Why?", False),
+])
+def test_is_standalone(message, standalone):
+    assert is_standalone(message) is standalone